@@ -1,6 +1,6 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, logger
 from fastapi.middleware.cors import CORSMiddleware
 
 from api_models import DayPrediction, DayPredictionV2, PredictionRequest, PredictionRequest2
@@ -14,14 +14,19 @@ from routers import (
     predictions_router,
     settings_router,
 )
-from solver import generate_mock_predictions, generate_predictions
+from solver import generate_mock_predictions, generate_predictions, warm_up
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan: create tables on startup."""
+    """Application lifespan: create tables and warm up the solver on startup."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    try:
+        warm_up()
+    except Exception as e:
+        # The warm-up only saves first-request latency; endpoints that do not use the solver must still start
+        logger.logger.warning("Solver warm-up failed: %s", e)
     yield
 
 
@@ -4,6 +4,7 @@ import time
 from datetime import date, timedelta
 from decimal import Decimal
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.inventory import InventorySnapshot
@@ -13,7 +14,7 @@ from repositories.inventory import InventoryRepository
 from repositories.office import OfficeRepository
 from repositories.optimization import OptimizationRepository
 from repositories.order import OrderRepository
-from solver import SolverFail, SolverInput, SolverOutput, estimate_demand, solve
+from solver import SolverFail, SolverInput, SolverOutput, estimate_demand_vec, solve
 
 
 class OptimizationService:
@@ -68,10 +69,10 @@ class OptimizationService:
             raise ValueError(f"Office with ID {office_id} not found")
 
         # Calculate demand for each day
-        demands = [
-            estimate_demand(workers, conferences)
-            for workers, conferences in zip(num_workers_daily, num_conferences_daily)
-        ]
+        demands = estimate_demand_vec(
+            np.asarray(num_workers_daily, dtype=np.float64),
+            np.asarray(num_conferences_daily, dtype=np.float64),
+        ).tolist()
 
         # Prepare solver input
         solver_input = SolverInput(
@@ -2,6 +2,7 @@
 
 from datetime import date
 from decimal import Decimal
+from functools import cached_property
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,8 +14,17 @@ class OrderService:
     """Service for order operations."""
 
     def __init__(self, session: AsyncSession) -> None:
-        self.order_repo = OrderRepository(session)
-        self.correction_repo = OrderCorrectionRepository(session)
+        self.session = session
+
+    @cached_property
+    def order_repo(self) -> OrderRepository:
+        """Order repository, created on first use and reused for the service lifetime."""
+        return OrderRepository(self.session)
+
+    @cached_property
+    def correction_repo(self) -> OrderCorrectionRepository:
+        """Order correction repository, created on first use and reused for the service lifetime."""
+        return OrderCorrectionRepository(self.session)
 
     async def get_by_id(self, order_id: int) -> Order | None:
         """Get order by ID."""
@@ -1,7 +1,9 @@
 import json
 import random
+from dataclasses import asdict, dataclass
 from typing import NamedTuple
 
+import numpy as np
 from docplex.mp.model import Model  # type: ignore[import-untyped]
 from fastapi import logger
 
@@ -81,7 +83,8 @@ class SolverInput(NamedTuple):
     T: int = 7
 
 
-class SolverOutput(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class SolverOutput:
     """Decision variables (solution) for the planning horizon T.
 
     - x — amount ordered each day t (kg)
@@ -99,6 +102,39 @@ class SolverOutput(NamedTuple):
 class SolverFail(RuntimeError): ...
 
 
+class _LazyJson:
+    """Defers `json.dumps` of a solver output until the log record is actually formatted."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: SolverOutput) -> None:
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return json.dumps(asdict(self.obj), indent=4)
+
+
+def _solve_without_orders(inp: SolverInput) -> SolverOutput | None:
+    """Return the zero-order solution if it is feasible and trivially optimal, else None.
+
+    With non-negative costs, never ordering has objective 0, so whenever the inventory
+    projected under x=0 stays within [0, V_max] for the whole horizon there is no need
+    to build the MIP at all.
+    """
+    if inp.C < 0 or any(p < 0 for p in inp.P):
+        return None
+
+    projected_I = []
+    level = inp.I0
+    for t in range(inp.T):
+        level = (1 - inp.alpha) * level - inp.D[t]
+        if level < 0 or level > inp.V_max:
+            return None
+        projected_I.append(float(level))
+
+    return SolverOutput(x=[0.0] * inp.T, I=projected_I, y=[0] * inp.T, objective_value=0.0)
+
+
 def solve(inp: SolverInput) -> SolverOutput:
     """Build and solve the inventory/ordering MIP.
 
@@ -108,6 +144,10 @@ def solve(inp: SolverInput) -> SolverOutput:
     if len(inp.P) != T or len(inp.D) != T:
         raise ValueError(f"Length of P and D must equal T={T}. Got len(P)={len(inp.P)}, len(D)={len(inp.D)}")
 
+    trivial = _solve_without_orders(inp)
+    if trivial is not None:
+        return trivial
+
     m = Model(name="coffee_inventory")
 
     # decision variables indexed 0..T-1
@@ -119,39 +159,42 @@ def solve(inp: SolverInput) -> SolverOutput:
     m.minimize(m.sum(inp.P[t] * x[t] for t in range(T)) + inp.C * m.sum(y))
 
     # I1 = (1-alpha) I0 + x1 - D1
-    m.add_constraint(I[0] == (1 - inp.alpha) * inp.I0 + x[0] - inp.D[0])
-
     # It = (1-alpha) I(t-1) + x_t - D_t for t=2..T
-    for t in range(1, T):
-        m.add_constraint(I[t] == (1 - inp.alpha) * I[t - 1] + x[t] - inp.D[t])
+    m.add_constraints(I[t] == (1 - inp.alpha) * (inp.I0 if t == 0 else I[t - 1]) + x[t] - inp.D[t] for t in range(T))
 
     # I_t <= V_max
-    for t in range(T):
-        m.add_constraint(I[t] <= inp.V_max)
+    m.add_constraints(I[t] <= inp.V_max for t in range(T))
 
     # x_t <= M * y_t
-    for t in range(T):
-        m.add_constraint(x[t] <= inp.M * y[t])
+    m.add_constraints(x[t] <= inp.M * y[t] for t in range(T))
 
     sol = m.solve()
     if sol is None:
         status = m.get_solve_status()
         raise SolverFail(f"Solver failed to return a solution. Status: {status}")
 
-    x_vals = [float(x[t].solution_value) for t in range(T)]
-    I_vals = [float(I[t].solution_value) for t in range(T)]
-    y_vals = [int(round(y[t].solution_value)) for t in range(T)]
+    x_vals = np.fromiter((v.solution_value for v in x), dtype=np.float64, count=T).tolist()
+    I_vals = np.fromiter((v.solution_value for v in I), dtype=np.float64, count=T).tolist()
+    y_vals = np.rint(np.fromiter((v.solution_value for v in y), dtype=np.float64, count=T)).astype(np.int64).tolist()
     obj = float(m.objective_value)
 
     return SolverOutput(x=x_vals, I=I_vals, y=y_vals, objective_value=obj)
 
 
-def estimate_demand(num_workers: int, num_conferences: int) -> float:
+def warm_up() -> None:
+    """Solve a one-day instance so the CPLEX runtime is loaded before the first real request.
+
+    The instance needs an order on day 1, so it cannot be answered by the no-order shortcut.
+    """
+    solve(SolverInput(V_max=1.0, P=[1.0], C=1.0, D=[1.0], I0=0.0, T=1))
+
+
+def estimate_demand_vec(num_workers: np.ndarray, num_conferences: np.ndarray) -> np.ndarray:
+    """Estimate daily demand [kg] over the whole planning horizon."""
     # dummy demand estimation logic
     base_demand_per_worker_kg = 0.25  # kg per worker per day
-    conference_multiplier = 1.2**num_conferences
-    estimated_demand = num_workers * base_demand_per_worker_kg * conference_multiplier
-    return estimated_demand
+    conference_multiplier = np.power(1.2, num_conferences)
+    return np.asarray(num_workers * base_demand_per_worker_kg * conference_multiplier, dtype=np.float64)
 
 
 def generate_predictions(prediction_request: PredictionRequest2) -> list[DayPredictionV2]:
@@ -164,10 +207,10 @@ def generate_predictions(prediction_request: PredictionRequest2) -> list[DayPred
         List of DayPrediction with consumption, orders, and remaining amounts.
     """
     T = prediction_request.planning_horizon_days
-    demand_estimates = [
-        estimate_demand(prediction_request.num_workers_daily[t], prediction_request.num_conferences_daily[t])
-        for t in range(T)
-    ]
+    demand_estimates = estimate_demand_vec(
+        np.asarray(prediction_request.num_workers_daily, dtype=np.float64),
+        np.asarray(prediction_request.num_conferences_daily, dtype=np.float64),
+    ).tolist()
 
     solver_input = SolverInput(
         V_max=prediction_request.storage_capacity_kg,
@@ -181,26 +224,24 @@ def generate_predictions(prediction_request: PredictionRequest2) -> list[DayPred
 
     try:
         solver_output = solve(solver_input)
-        logger.logger.warning("Solver output: %s", json.dumps(solver_output._asdict(), indent=4))
+        logger.logger.warning("Solver output: %s", _LazyJson(solver_output))
     except SolverFail as e:
         logger.logger.error("Solver failed: %s", e)
         raise
 
-    predictions = []
-
-    for day in range(T):
-        order_amount = solver_output.x[day]
-        consumed_amount = demand_estimates[day]
-
-        predictions.append(
-            DayPredictionV2(
-                day=day + 1,
-                orderAmount=round(order_amount, 2),
-                consumedAmount=round(consumed_amount, 2),
-                remainingAmount=round(solver_output.I[day], 2),
-                unit="kg",
-            )
+    # Values come straight from the solver as floats, so pydantic validation is skipped
+    predictions = [
+        DayPredictionV2.model_construct(
+            day=day + 1,
+            orderAmount=round(order_amount, 2),
+            consumedAmount=round(consumed_amount, 2),
+            remainingAmount=round(remaining_amount, 2),
+            unit="kg",
+        )
+        for day, (order_amount, consumed_amount, remaining_amount) in enumerate(
+            zip(solver_output.x, demand_estimates, solver_output.I)
         )
+    ]
 
     logger.logger.info("Generated predictions: %s", predictions)
 
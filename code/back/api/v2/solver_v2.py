@@ -5,9 +5,23 @@ buildings, delivery times, and volume-based pricing tiers.
 Based on the mathematical model described in main.tex.
 """
 
-from typing import NamedTuple
-
+import importlib
+import os
+import tempfile
+from collections import defaultdict
+from collections.abc import Callable, Hashable
+from typing import Any, Literal, NamedTuple, Protocol, TypeVar
+
+import numpy as np
+from docplex.mp.constants import EffortLevel  # type: ignore[import-untyped]
 from docplex.mp.model import Model  # type: ignore[import-untyped]
+from docplex.mp.solution import SolveSolution  # type: ignore[import-untyped]
+from docplex.util.status import JobSolveStatus  # type: ignore[import-untyped]
+
+try:  # optional, only needed for backend="highs"
+    highspy: Any = importlib.import_module("highspy")
+except ImportError:
+    highspy = None
 
 
 class SolverInputV2(NamedTuple):
@@ -84,10 +98,359 @@ class SolverFail(RuntimeError):
     pass
 
 
-def solve(inp: SolverInputV2) -> SolverOutputV2:
+Backend = Literal["cplex", "highs", "auto"]
+
+# Models with fewer (distributor, building, day, threshold) cells than this count as small
+_SMALL_MODEL_SIZE = 5000
+
+
+def _solve_highs(m: Model, mip_gap: float, time_limit: float | None) -> tuple[dict[str, float], float]:
+    """
+    Solve a built docplex model with HiGHS by exporting it as an LP file.
+
+    Returns variable values by name and the objective value, or raises SolverFail.
+    """
+    if highspy is None:
+        raise SolverFail('backend="highs" requires the highspy package')
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.setOptionValue("mip_rel_gap", mip_gap)
+    if time_limit:
+        h.setOptionValue("time_limit", float(time_limit))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        lp_path = os.path.join(tmp_dir, f"{m.name}.lp")
+        with open(lp_path, "w") as f:
+            f.write(m.export_as_lp_string())
+        h.readModel(lp_path)
+    h.run()
+
+    info = h.getInfo()
+    if info.primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+        raise SolverFail(f"Solver failed to return a solution. Status: {h.modelStatusToString(h.getModelStatus())}")
+
+    values = dict(zip(h.getLp().col_names_, h.getSolution().col_value))
+    return values, float(info.objective_function_value)
+
+
+StructuralKey = tuple[
+    int, int, int, int, tuple[float, ...], tuple[tuple[int, ...], ...], tuple[tuple[float, ...], ...], float, bool
+]
+
+# Number of distinct model shapes kept alive between solve() calls (per solver module)
+_MODEL_CACHE_SIZE = 8
+_MODEL_CACHE: dict[StructuralKey, "_CachedModel"] = {}
+
+
+class _BalanceInput(Protocol):
+    """Input fields read by the inventory balance, shared by SolverInputV2 and SolverInputV2Correction."""
+
+    @property
+    def T(self) -> int: ...
+    @property
+    def Demand(self) -> list[list[float]]: ...
+    @property
+    def I_0(self) -> list[float]: ...
+    @property
+    def alpha(self) -> float: ...
+    @property
+    def X(self) -> list[list[int]]: ...
+    @property
+    def x_hist(self) -> dict[tuple[int, int, int], float]: ...
+
+
+class _CacheableModel(Protocol):
+    """A built model that can be refreshed in place with new data of the same structure."""
+
+    model: Any
+
+    def update(self, inp: Any) -> None: ...
+
+
+_ModelT = TypeVar("_ModelT", bound=_CacheableModel)
+
+
+def _get_cached_model(cache: dict[Any, _ModelT], key: Hashable, inp: Any, build: Callable[[], _ModelT]) -> _ModelT:
+    """Return the model cached under key updated with inp, or build and cache a new one.
+
+    When the cache is full, the oldest model is evicted and its CPLEX model ended.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        cached.update(inp)
+        return cached
+
+    if len(cache) >= _MODEL_CACHE_SIZE:
+        cache.pop(next(iter(cache))).model.end()
+    cached = cache[key] = build()
+    return cached
+
+
+def _structural_key(inp: SolverInputV2, lazy_limits: bool) -> StructuralKey:
+    """Inputs that determine the variables and constraint coefficients of the model.
+
+    Everything else (demand, initial and historical stock, capacities and prices) only
+    enters the objective or right-hand sides.
+    """
+    return (
+        inp.T,
+        inp.D,
+        inp.B,
+        inp.L,
+        tuple(inp.Q),
+        tuple(tuple(row) for row in inp.X),
+        tuple(tuple(row) for row in inp.S),
+        inp.alpha,
+        lazy_limits,
+    )
+
+
+def _order_mask(inp: SolverInputV2) -> np.ndarray:
+    """Boolean (D, B, T) mask of orders that arrive within the horizon.
+
+    An order placed on day t arrives on day t + X[d][b]; orders arriving after the horizon only
+    add cost, so variables and constraints are created only for orders that arrive in time.
+    """
+    return np.arange(inp.T) + np.asarray(inp.X, dtype=np.int64)[:, :, None] < inp.T
+
+
+def _cost_coefficients(inp: SolverInputV2) -> tuple[list[float], ...]:
+    """
+    Objective coefficients of x_0, x and y_order, flattened in variable order.
+
+    Prices are broadcast over the axes they do not depend on and masked to the valid orders.
+    """
+    D, B, T, L = inp.D, inp.B, inp.T, inp.L
+    mask = _order_mask(inp)
+    return (
+        np.broadcast_to(np.asarray(inp.P_0, dtype=np.float64)[:, None, :], (D, B, T))[mask].tolist(),
+        np.broadcast_to(np.asarray(inp.P, dtype=np.float64)[:, None, :, :], (D, B, T, L))[mask].ravel().tolist(),
+        np.broadcast_to(np.asarray(inp.C_fix, dtype=np.float64)[:, :, None], (D, B, T))[mask].tolist(),
+    )
+
+
+def _historical_arrivals(inp: _BalanceInput) -> defaultdict[tuple[int, int], float]:
+    """Historical orders (placed on day tau < 0) arriving within the horizon, bucketed by (b, t)."""
+    hist_by_bt: defaultdict[tuple[int, int], float] = defaultdict(float)
+    for (d, b, tau), amount in inp.x_hist.items():
+        t = tau + inp.X[d][b]
+        if tau < 0 and 0 <= t < inp.T:
+            hist_by_bt[b, t] += amount
+    return hist_by_bt
+
+
+def _balance_rhs(inp: _BalanceInput, hist_by_bt: defaultdict[tuple[int, int], float], b: int, t: int) -> float:
+    """Constant part of the inventory balance for building b on day t."""
+    rhs = hist_by_bt.get((b, t), 0.0) - inp.Demand[b][t]
+    if t == 0:
+        rhs += (1 - inp.alpha) * inp.I_0[b]
+    return rhs
+
+
+class _CachedModel:
+    """
+    MIP for one structural shape, kept alive across solve() calls.
+
+    The first solve builds the full model. Subsequent solves with the same
+    structural key only rewrite objective coefficients and right-hand sides,
+    and seed CPLEX with the previous solution as a MIP start.
+    """
+
+    def __init__(self, inp: SolverInputV2, lazy_limits: bool) -> None:
+        T, D, B, L = inp.T, inp.D, inp.B, inp.L
+
+        m = Model(name="coffee_inventory_v2")
+        self.model = m
+        self.lazy_limits = lazy_limits
+        self.last_solution: SolveSolution | None = None
+
+        # Index sets
+        valid_dbt = [(d, b, t) for d, b, t in np.argwhere(_order_mask(inp)).tolist()]
+        valid_dbtl = [(d, b, t, l) for d, b, t in valid_dbt for l in range(1, L + 1)]
+        bt = [(b, t) for b in range(B) for t in range(T)]
+
+        # Upper bound for the last threshold level and widths of the threshold bands
+        S_max = float(np.max(inp.S))
+        Q_diff = [inp.Q[l + 1] - inp.Q[l] for l in range(L)]
+
+        # Decision variables
+        # x_{d,b,t,0} - amount ordered below first threshold
+        x_0 = m.continuous_var_dict(valid_dbt, lb=0, name=lambda k: f"x_below_d{k[0]}_b{k[1]}_t{k[2]}")
+
+        # x_{d,b,t,l} - amount ordered at threshold level l
+        x = m.continuous_var_dict(valid_dbtl, lb=0, name=lambda k: f"x_d{k[0]}_b{k[1]}_t{k[2]}_l{k[3]}")
+
+        # I_{b,t} - inventory at building b at end of day t
+        I = m.continuous_var_dict(bt, lb=0, name=lambda k: f"inv_b{k[0]}_t{k[1]}")
+
+        # y^{order}_{d,b,t} - binary indicator if order placed
+        y_order = m.binary_var_dict(valid_dbt, name=lambda k: f"y_order_d{k[0]}_b{k[1]}_t{k[2]}")
+
+        # y^{threshold}_{d,b,t,l} - binary indicator if threshold l reached
+        y_threshold = m.binary_var_dict(valid_dbtl, name=lambda k: f"y_thresh_d{k[0]}_b{k[1]}_t{k[2]}_l{k[3]}")
+
+        self.x_0, self.x, self.I = x_0, x, I
+        self.y_order, self.y_threshold = y_order, y_threshold
+
+        # Objective function: minimize total cost
+        # Cost = purchase cost + fixed delivery cost
+        # Each term is a single scal_prod over variables and coefficients flattened in index-set order
+        P_0_coefs, P_coefs, C_fix_coefs = _cost_coefficients(inp)
+
+        purchase_cost = m.scal_prod(list(x_0.values()), P_0_coefs)
+
+        threshold_cost = m.scal_prod(list(x.values()), P_coefs)
+
+        fixed_cost = m.scal_prod(list(y_order.values()), C_fix_coefs)
+
+        m.minimize(purchase_cost + threshold_cost + fixed_cost)
+
+        # Constraints
+        # Every data-dependent constant is kept on the right-hand side, so update() can rewrite it in place
+        # Families that update() never touches are added with add_constraints_, which skips building handles
+
+        # 1. Inventory balance with delivery times and historical orders
+        # Orders placed on day tau from distributor d arrive at building b on day tau + X[d][b];
+        # index them once by arrival (b, t) instead of scanning all (d, tau) for every (b, t)
+        arrivals: defaultdict[tuple[int, int], list[tuple[int, int]]] = defaultdict(list)
+        for d in range(D):
+            for b in range(B):
+                for tau in range(T):
+                    t = tau + inp.X[d][b]
+                    if 0 <= t < T:
+                        arrivals[b, t].append((d, tau))
+
+        hist_by_bt = _historical_arrivals(inp)
+
+        def build_balance(key: tuple[int, int]) -> Any:
+            b, t = key
+            # Deliveries arriving on day t (ordered at tau where tau + X[d][b] = t), accumulated in one expression
+            deliveries_today = m.linear_expr()
+            for d, tau in arrivals[b, t]:
+                deliveries_today.add_term(x_0[d, b, tau], 1)
+                for l in range(1, L + 1):
+                    deliveries_today.add_term(x[d, b, tau, l], 1)
+
+            # I[b,t] - (1-alpha)*I[b,t-1] - deliveries = historical deliveries - demand (+ (1-alpha)*I_0[b] on day 0)
+            carried_over = 0 if t == 0 else (1 - inp.alpha) * I[b, t - 1]
+            return I[b, t] - carried_over - deliveries_today == _balance_rhs(inp, hist_by_bt, b, t)
+
+        balance_cts = [build_balance(key) for key in bt]
+        self.balance_cts = dict(zip(bt, m.add_constraints(balance_cts)))
+
+        # 2. Link order amount to binary order indicator
+        # x_0 <= S * y_order and x_0 <= Q[1] are merged into a single row with the tighter bound
+        m.add_constraints_(x_0[d, b, t] <= min(inp.S[d][t], inp.Q[1]) * y_order[d, b, t] for d, b, t in valid_dbt)
+
+        # 3. Distributor supply limit, total ordered from d on day t
+        self.supply_lhs = {}
+        for d in range(D):
+            for t in range(T):
+                ordered = m.linear_expr()
+                for b in range(B):
+                    if (d, b, t) in x_0:
+                        ordered.add_term(x_0[d, b, t], 1)
+                        for l in range(1, L + 1):
+                            ordered.add_term(x[d, b, t, l], 1)
+                self.supply_lhs[d, t] = ordered
+
+        # 4. Warehouse capacity constraints, registered together with the supply limit
+        # Capacity and supply limits rarely bind, so CPLEX gets them as lazy constraints that only enter
+        # the LP once violated; the LP export read by HiGHS has no lazy section, so there they stay eager
+        if lazy_limits:
+            self.capacity_cts = {}
+            self.set_lazy_limits(inp)
+        else:
+            self.capacity_cts = dict(zip(bt, m.add_constraints(I[b, t] <= inp.V_max[b] for b, t in bt)))
+            m.add_constraints_(lhs <= inp.S[d][t] for (d, t), lhs in self.supply_lhs.items())
+
+        # 5. Threshold constraints
+        # For each (d, b, t), the total order is partitioned across thresholds
+
+        # Link threshold variables to order variable
+        # Threshold variables can only be active if an order is placed. Only the first level needs the row:
+        # Q_diff[l] * y_threshold[l+1] <= x[l] <= Q_diff[l] * y_threshold[l] below gives
+        # y_threshold[l+1] <= y_threshold[l] for every non-empty band, so higher levels follow by chaining
+        m.add_constraints_(y_threshold[d, b, t, 1] <= y_order[d, b, t] for d, b, t in valid_dbt)
+        m.add_constraints_(
+            y_threshold[d, b, t, l + 1] <= y_threshold[d, b, t, l]
+            for d, b, t, l in valid_dbtl
+            if l < L and Q_diff[l] <= 0
+        )
+
+        # For intermediate thresholds l=1..L-1
+        # x[l] can be at most (Q[l+1] - Q[l])
+        m.add_constraints_(x[d, b, t, l] <= Q_diff[l] * y_threshold[d, b, t, l] for d, b, t, l in valid_dbtl if l < L)
+
+        # For the last threshold L
+        # x[L] can be at most S_max (large enough value)
+        m.add_constraints_(x[d, b, t, L] <= S_max * y_threshold[d, b, t, L] for d, b, t in valid_dbt)
+
+        # Threshold activation constraints
+        # If threshold l+1 is active, threshold l must be full
+        # x_0 >= Q[1] * y_threshold[1]
+        m.add_constraints_(x_0[d, b, t] >= inp.Q[1] * y_threshold[d, b, t, 1] for d, b, t in valid_dbt)
+
+        # For l=1..L-1: x[l] >= (Q[l+1] - Q[l]) * y_threshold[l+1]
+        m.add_constraints_(
+            x[d, b, t, l] >= Q_diff[l] * y_threshold[d, b, t, l + 1] for d, b, t, l in valid_dbtl if l < L
+        )
+
+    def set_lazy_limits(self, inp: SolverInputV2) -> None:
+        """
+        Register warehouse capacity and distributor supply limits as lazy constraints.
+
+        Lazy constraints cannot be modified in place, so they are cleared and re-added on every update.
+        """
+        m = self.model
+        m.clear_lazy_constraints()
+        m.add_lazy_constraints([self.I[b, t] <= inp.V_max[b] for b, t in self.I])
+        m.add_lazy_constraints([lhs <= inp.S[d][t] for (d, t), lhs in self.supply_lhs.items()])
+
+    def update(self, inp: SolverInputV2) -> None:
+        """Rewrite objective coefficients and right-hand sides for new non-structural data."""
+        hist_by_bt = _historical_arrivals(inp)
+        for (b, t), ct in self.balance_cts.items():
+            ct.rhs = _balance_rhs(inp, hist_by_bt, b, t)
+        for (b, t), ct in self.capacity_cts.items():
+            ct.rhs = inp.V_max[b]
+        if self.lazy_limits:
+            self.set_lazy_limits(inp)
+
+        objective = self.model.objective_expr
+        for family, coefs in zip((self.x_0, self.x, self.y_order), _cost_coefficients(inp)):
+            for var, coef in zip(family.values(), coefs):
+                objective.set_coefficient(var, coef)
+
+        # Previous plan as a starting incumbent; CPLEX repairs it if the new data made it infeasible
+        if self.last_solution is not None:
+            self.model.clear_mip_starts()
+            self.model.add_mip_start(self.last_solution, effort_level=EffortLevel.Repair)
+
+
+def _get_model(inp: SolverInputV2, lazy_limits: bool) -> _CachedModel:
+    """Return a model for the input's structure, building it or updating a cached one."""
+    return _get_cached_model(
+        _MODEL_CACHE, _structural_key(inp, lazy_limits), inp, lambda: _CachedModel(inp, lazy_limits)
+    )
+
+
+def solve(
+    inp: SolverInputV2, mip_gap: float = 0.005, time_limit: float | None = 300, backend: Backend = "cplex"
+) -> SolverOutputV2:
     """
     Build and solve the advanced coffee ordering MIP model.
 
+    Models are cached by structural shape (see `_structural_key`), so repeated calls
+    with new demand, stock, capacities or prices reuse the built model.
+
+    mip_gap is the relative MIP gap at which the solver stops, and time_limit caps solve time in
+    seconds (None for no limit); a feasible solution found within the limit is accepted.
+
+    backend selects the MIP solver: "cplex", "highs" (requires highspy) or "auto", which uses
+    HiGHS for small models when highspy is installed and CPLEX otherwise.
+
     Returns SolverOutputV2 with the optimal solution or raises SolverFail on error.
     """
     T, D, B, L = inp.T, inp.D, inp.B, inp.L
@@ -104,178 +467,147 @@ def solve(inp: SolverInputV2) -> SolverOutputV2:
     assert len(inp.S) == D and all(len(inp.S[d]) == T for d in range(D))
     assert len(inp.X) == D and all(len(inp.X[d]) == B for d in range(D))
 
-    m = Model(name="coffee_inventory_v2")
+    small_model = D * B * T * L < _SMALL_MODEL_SIZE
+    if backend == "auto":
+        backend = "highs" if small_model and highspy is not None else "cplex"
 
-    # Decision variables
-    # x_{d,b,t,0} - amount ordered below first threshold
-    x_0 = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                x_0[d, b, t] = m.continuous_var(lb=0, name=f"x_below_d{d}_b{b}_t{t}")
+    cached = _get_model(inp, lazy_limits=backend == "cplex")
+    m = cached.model
+    x_0, x, I = cached.x_0, cached.x, cached.I
+    y_order, y_threshold = cached.y_order, cached.y_threshold
 
-    # x_{d,b,t,l} - amount ordered at threshold level l
-    x = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                for l in range(1, L + 1):
-                    x[d, b, t, l] = m.continuous_var(lb=0, name=f"x_d{d}_b{b}_t{t}_l{l}")
-
-    # I_{b,t} - inventory at building b at end of day t
-    I = {}
-    for b in range(B):
-        for t in range(T):
-            I[b, t] = m.continuous_var(lb=0, name=f"inv_b{b}_t{t}")
-
-    # y^{order}_{d,b,t} - binary indicator if order placed
-    y_order = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                y_order[d, b, t] = m.binary_var(name=f"y_order_d{d}_b{b}_t{t}")
+    # Solve
+    value_list: Callable[[list[Any]], list[float]]
+    if backend == "highs":
+        values_by_name, obj = _solve_highs(m, mip_gap, time_limit)
+        value_list = lambda variables: [values_by_name.get(v.name, 0.0) for v in variables]
+    else:
+        # Stop at a relative MIP gap of mip_gap instead of proving optimality, optionally within time_limit seconds
+        m.parameters.mip.tolerances.mipgap = mip_gap
+        if time_limit:
+            m.parameters.timelimit = time_limit
+        else:
+            m.parameters.timelimit.reset()
+        # Small models are solved at the root or in a few nodes; periodic heuristics only add overhead there
+        if small_model:
+            m.parameters.mip.strategy.heuristicfreq = -1
+        sol = m.solve()
 
-    # y^{threshold}_{d,b,t,l} - binary indicator if threshold l reached
-    y_threshold = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                for l in range(1, L + 1):
-                    y_threshold[d, b, t, l] = m.binary_var(name=f"y_thresh_d{d}_b{b}_t{t}_l{l}")
-
-    # Objective function: minimize total cost
-    # Cost = purchase cost + fixed delivery cost
-    purchase_cost = m.sum(inp.P_0[d][t] * x_0[d, b, t] for d in range(D) for b in range(B) for t in range(T))
-
-    threshold_cost = m.sum(
-        inp.P[d][t][l - 1] * x[d, b, t, l]
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    )
+        status = m.get_solve_status()
+        if sol is None or status not in (JobSolveStatus.OPTIMAL_SOLUTION, JobSolveStatus.FEASIBLE_SOLUTION):
+            raise SolverFail(f"Solver failed to return a solution. Status: {status}")
+        cached.last_solution = sol
+        value_list = sol.get_value_list
+        obj = float(m.objective_value)
 
-    fixed_cost = m.sum(inp.C_fix[d][b] * y_order[d, b, t] for d in range(D) for b in range(B) for t in range(T))
-
-    m.minimize(purchase_cost + threshold_cost + fixed_cost)
-
-    # Constraints
-
-    # 1. Inventory balance with delivery times and historical orders
-    for b in range(B):
-        for t in range(T):
-            # Deliveries arriving on day t (ordered at tau where tau + X[d][b] = t)
-            deliveries_today = m.sum(x_0[d, b, tau] for d in range(D) for tau in range(T) if tau + inp.X[d][b] == t)
-
-            deliveries_today += m.sum(
-                x[d, b, tau, l] for d in range(D) for tau in range(T) for l in range(1, L + 1) if tau + inp.X[d][b] == t
-            )
-
-            # Historical orders arriving today
-            hist_deliveries_today = sum(
-                inp.x_hist.get((d, b, tau), 0.0)
-                for d in range(D)
-                for tau in range(-100, 0)  # Check historical days
-                if tau + inp.X[d][b] == t
-            )
-
-            if t == 0:
-                # First day: I[b,0] = (1-alpha)*I_0[b] + deliveries - demand
-                m.add_constraint(
-                    I[b, t]
-                    == (1 - inp.alpha) * inp.I_0[b] + deliveries_today + hist_deliveries_today - inp.Demand[b][t]
-                )
-            else:
-                # Other days: I[b,t] = (1-alpha)*I[b,t-1] + deliveries - demand
-                m.add_constraint(
-                    I[b, t]
-                    == (1 - inp.alpha) * I[b, t - 1] + deliveries_today + hist_deliveries_today - inp.Demand[b][t]
-                )
-
-    # 2. Warehouse capacity constraints
-    for b in range(B):
-        for t in range(T):
-            m.add_constraint(I[b, t] <= inp.V_max[b])
-
-    # 3. Link order amount to binary order indicator
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                m.add_constraint(x_0[d, b, t] <= inp.S[d][t] * y_order[d, b, t])
+    # Extract solution with one batched value lookup per variable family;
+    # orders without variables (arriving after the horizon) are reported as 0
+    dbt = [(d, b, t) for d in range(D) for b in range(B) for t in range(T)]
+    dbtl = [(d, b, t, l) for d, b, t in dbt for l in range(1, L + 1)]
 
-    # 4. Distributor supply limit
-    for d in range(D):
-        for t in range(T):
-            total_ordered = m.sum(x_0[d, b, t] for b in range(B))
-            total_ordered += m.sum(x[d, b, t, l] for b in range(B) for l in range(1, L + 1))
-            m.add_constraint(total_ordered <= inp.S[d][t])
+    x_0_vals = dict.fromkeys(dbt, 0.0)
+    x_0_vals.update(zip(x_0, value_list(list(x_0.values()))))
 
-    # 5. Threshold constraints
-    # For each (d, b, t), the total order is partitioned across thresholds
+    x_vals = dict.fromkeys(dbtl, 0.0)
+    x_vals.update(zip(x, value_list(list(x.values()))))
 
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                # Link threshold variables to order variable
-                # Threshold variables can only be active if an order is placed
-                for l in range(1, L + 1):
-                    m.add_constraint(y_threshold[d, b, t, l] <= y_order[d, b, t])
+    I_vals = dict(zip(I, value_list(list(I.values()))))
 
-                # x_0 is limited by first threshold Q[1]
-                m.add_constraint(x_0[d, b, t] <= inp.Q[1])
+    y_order_vals = dict.fromkeys(dbt, 0)
+    y_order_vals.update(zip(y_order, (int(round(v)) for v in value_list(list(y_order.values())))))
 
-                # For intermediate thresholds l=1..L-1
-                for l in range(1, L):
-                    # x[l] can be at most (Q[l+1] - Q[l])
-                    m.add_constraint(x[d, b, t, l] <= (inp.Q[l + 1] - inp.Q[l]) * y_threshold[d, b, t, l])
+    y_threshold_vals = dict.fromkeys(dbtl, 0)
+    y_threshold_vals.update(zip(y_threshold, (int(round(v)) for v in value_list(list(y_threshold.values())))))
 
-                # For the last threshold L
-                # x[L] can be at most S_max (large enough value)
-                S_max = max(inp.S[d][t] for d in range(D) for t in range(T))
-                m.add_constraint(x[d, b, t, L] <= S_max * y_threshold[d, b, t, L])
+    return SolverOutputV2(
+        x_0=x_0_vals, x=x_vals, I=I_vals, y_order=y_order_vals, y_threshold=y_threshold_vals, objective_value=obj
+    )
 
-                # Threshold activation constraints
-                # If threshold l+1 is active, threshold l must be full
-                # x_0 >= Q[1] * y_threshold[1]
-                m.add_constraint(x_0[d, b, t] >= inp.Q[1] * y_threshold[d, b, t, 1])
 
-                # For l=1..L-1: x[l] >= (Q[l+1] - Q[l]) * y_threshold[l+1]
-                for l in range(1, L):
-                    m.add_constraint(x[d, b, t, l] >= (inp.Q[l + 1] - inp.Q[l]) * y_threshold[d, b, t, l + 1])
+def solve_rolling(
+    inp: SolverInputV2,
+    slice_len: int = 7,
+    overlap: int = 1,
+    mip_gap: float = 0.005,
+    time_limit: float | None = 300,
+    backend: Backend = "cplex",
+) -> SolverOutputV2:
+    """
+    Solve a long horizon as a sequence of overlapping slices of slice_len days.
 
-    # Solve
-    sol = m.solve()
+    Each slice starts slice_len - overlap days after the previous one. Only the days before
+    the next slice's start are committed; the overlap is re-planned by the next slice, which
+    starts from the committed inventory and sees committed orders still in transit as
+    historical orders. Solves are passed mip_gap, time_limit and backend as in solve().
 
-    if sol is None:
-        status = m.get_solve_status()
-        raise SolverFail(f"Solver failed to return a solution. Status: {status}")
-
-    # Extract solution
-    x_0_vals = {(d, b, t): float(x_0[d, b, t].solution_value) for d in range(D) for b in range(B) for t in range(T)}
-
-    x_vals = {
-        (d, b, t, l): float(x[d, b, t, l].solution_value)
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    }
-
-    I_vals = {(b, t): float(I[b, t].solution_value) for b in range(B) for t in range(T)}
-
-    y_order_vals = {
-        (d, b, t): int(round(y_order[d, b, t].solution_value)) for d in range(D) for b in range(B) for t in range(T)
-    }
-
-    y_threshold_vals = {
-        (d, b, t, l): int(round(y_threshold[d, b, t, l].solution_value))
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    }
-
-    obj = float(m.objective_value)
+    The result is an approximation of solve(inp): a slice does not see demand beyond its end,
+    so stock carried across slice boundaries is not optimised jointly. overlap should be at
+    least the longest delivery time, otherwise deliveries needed early in a slice cannot be
+    ordered in time by the previous one.
+
+    Returns SolverOutputV2 over the full horizon, with objective_value the cost of the
+    committed orders, or raises SolverFail if any slice fails.
+    """
+    T, D, B, L = inp.T, inp.D, inp.B, inp.L
+    assert 0 <= overlap < slice_len
+
+    if T <= slice_len:
+        return solve(inp, mip_gap, time_limit, backend)
+
+    step = slice_len - overlap
+    dbt = [(d, b, t) for d in range(D) for b in range(B) for t in range(T)]
+    dbtl = [(d, b, t, l) for d, b, t in dbt for l in range(1, L + 1)]
+    x_0_vals = dict.fromkeys(dbt, 0.0)
+    x_vals = dict.fromkeys(dbtl, 0.0)
+    I_vals = dict.fromkeys([(b, t) for b in range(B) for t in range(T)], 0.0)
+    y_order_vals = dict.fromkeys(dbt, 0)
+    y_threshold_vals = dict.fromkeys(dbtl, 0)
+
+    I_0 = inp.I_0
+    for start in range(0, T, step):
+        end = min(start + slice_len, T)
+        # The last slice commits everything up to the end of the horizon
+        commit_end = end if end == T else start + step
+
+        # Orders from the input and committed earlier, re-indexed relative to the slice start
+        x_hist = {(d, b, tau - start): amount for (d, b, tau), amount in inp.x_hist.items()}
+        for d, b, t in dbt:
+            if t < start and y_order_vals[d, b, t]:
+                x_hist[d, b, t - start] = x_0_vals[d, b, t] + sum(x_vals[d, b, t, l] for l in range(1, L + 1))
+
+        out = solve(
+            inp._replace(
+                T=end - start,
+                P_0=[row[start:end] for row in inp.P_0],
+                P=[row[start:end] for row in inp.P],
+                Demand=[row[start:end] for row in inp.Demand],
+                I_0=I_0,
+                S=[row[start:end] for row in inp.S],
+                x_hist=x_hist,
+            ),
+            mip_gap,
+            time_limit,
+            backend,
+        )
+
+        for t in range(start, commit_end):
+            for d in range(D):
+                for b in range(B):
+                    x_0_vals[d, b, t] = out.x_0[d, b, t - start]
+                    y_order_vals[d, b, t] = out.y_order[d, b, t - start]
+                    for l in range(1, L + 1):
+                        x_vals[d, b, t, l] = out.x[d, b, t - start, l]
+                        y_threshold_vals[d, b, t, l] = out.y_threshold[d, b, t - start, l]
+            for b in range(B):
+                I_vals[b, t] = out.I[b, t - start]
+        if commit_end == T:
+            break
+        I_0 = [I_vals[b, commit_end - 1] for b in range(B)]
+
+    # Cost of the committed orders, as in the objective of solve()
+    obj = sum(inp.P_0[d][t] * amount for (d, b, t), amount in x_0_vals.items())
+    obj += sum(inp.P[d][t][l - 1] * amount for (d, b, t, l), amount in x_vals.items())
+    obj += sum(inp.C_fix[d][b] * placed for (d, b, t), placed in y_order_vals.items())
 
     return SolverOutputV2(
         x_0=x_0_vals, x=x_vals, I=I_vals, y_order=y_order_vals, y_threshold=y_threshold_vals, objective_value=obj
@@ -2,14 +2,21 @@
 Advanced coffee inventory optimization model with order correction capability.
 
 Extends solver_v2 by allowing modifications to previously planned orders
-using correction variables r+ (increase) and r- (decrease).
+by a correction |x - x_kor| priced per unit. The increase r+ and decrease r- of each order
+are reported alongside the final amounts.
 
 Based on Section 2 of model_final.tex: "Model matematyczny w wersji zaawansowanej z korektą"
 """
 
-from typing import NamedTuple
+from collections import defaultdict
+from typing import Any, NamedTuple
 
+import numpy as np
+from docplex.mp.constants import EffortLevel  # type: ignore[import-untyped]
 from docplex.mp.model import Model  # type: ignore[import-untyped]
+from docplex.mp.solution import SolveSolution  # type: ignore[import-untyped]
+from docplex.util.status import JobSolveStatus  # type: ignore[import-untyped]
+from solver_v2 import _balance_rhs, _get_cached_model, _historical_arrivals
 
 
 class SolverInputV2Correction(NamedTuple):
@@ -104,291 +111,414 @@ class SolverFail(RuntimeError):
     pass
 
 
-def solve(inp: SolverInputV2Correction) -> SolverOutputV2Correction:
+StructuralKey = tuple[
+    int,
+    int,
+    int,
+    int,
+    tuple[float, ...],
+    tuple[tuple[int, ...], ...],
+    tuple[tuple[float, ...], ...],
+    float,
+    tuple[tuple[int, int, int], ...],
+]
+
+# Model shapes kept alive between solve() calls; evicted by solver_v2._get_cached_model
+_MODEL_CACHE: dict[StructuralKey, "_CachedModel"] = {}
+
+
+def _structural_key(inp: SolverInputV2Correction) -> StructuralKey:
+    """Inputs that determine the variables and constraint coefficients of the model.
+
+    Everything else (demand, initial and historical stock, capacities, planned amounts,
+    prices, correction costs and limits) only enters the objective or right-hand sides.
     """
-    Build and solve the advanced coffee ordering MIP model with correction capability.
+    return (
+        inp.T,
+        inp.D,
+        inp.B,
+        inp.L,
+        tuple(inp.Q),
+        tuple(tuple(row) for row in inp.X),
+        tuple(tuple(row) for row in inp.S),
+        inp.alpha,
+        _order_keys(inp),
+    )
 
-    The model allows modifying previously planned orders (x_kor) by:
-    - r_plus: increasing the order amount
-    - r_minus: decreasing the order amount
 
-    Subject to correction costs (K per unit changed) and limits (R_max).
+def _order_mask(inp: SolverInputV2Correction) -> np.ndarray:
+    """Boolean (D, B, T) mask of orders that get decision variables.
 
-    Returns SolverOutputV2Correction with the optimal solution or raises SolverFail on error.
+    An order placed on day t arrives on day t + X[d][b]. Orders arriving after the horizon only
+    add cost, so they are left out of the model unless something was already planned for them:
+    cancelling a planned order is a correction with its own cost and must stay in the model.
     """
-    T, D, B, L = inp.T, inp.D, inp.B, inp.L
+    mask = np.arange(inp.T) + np.asarray(inp.X, dtype=np.int64)[:, :, None] < inp.T
+    for key, amount in inp.x_kor_0.items():
+        if amount:
+            mask[key] = True
+    for (d, b, t, _), amount in inp.x_kor.items():
+        if amount:
+            mask[d, b, t] = True
+    return mask
 
-    # Validation
-    assert len(inp.V_max) == B
-    assert len(inp.Q) == L + 1
-    assert len(inp.P_0) == D and all(len(inp.P_0[d]) == T for d in range(D))
-    assert len(inp.P) == D and all(len(inp.P[d]) == T for d in range(D))
-    assert all(len(inp.P[d][t]) == L for d in range(D) for t in range(T))
-    assert len(inp.C_fix) == D and all(len(inp.C_fix[d]) == B for d in range(D))
-    assert len(inp.Demand) == B and all(len(inp.Demand[b]) == T for b in range(B))
-    assert len(inp.I_0) == B
-    assert len(inp.S) == D and all(len(inp.S[d]) == T for d in range(D))
-    assert len(inp.X) == D and all(len(inp.X[d]) == B for d in range(D))
-    assert len(inp.K) == D and all(len(inp.K[d]) == B for d in range(D))
-    assert all(len(inp.K[d][b]) == T for d in range(D) for b in range(B))
-    assert len(inp.R_max) == D and all(len(inp.R_max[d]) == B for d in range(D))
-    assert all(len(inp.R_max[d][b]) == T for d in range(D) for b in range(B))
 
-    m = Model(name="coffee_inventory_v2_correction")
+def _order_keys(inp: SolverInputV2Correction) -> tuple[tuple[int, int, int], ...]:
+    """(d, b, t) of orders that get decision variables, in (d, b, t) order (see `_order_mask`)."""
+    return tuple((d, b, t) for d, b, t in np.argwhere(_order_mask(inp)).tolist())
 
-    # Decision variables
 
-    # x_{d,b,t,0} - final amount ordered below first threshold
-    x_0 = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                x_0[d, b, t] = m.continuous_var(lb=0, name=f"x_below_d{d}_b{b}_t{t}")
+def _cost_coefficients(inp: SolverInputV2Correction) -> tuple[list[float], ...]:
+    """
+    Objective coefficients of x_0, x, y_order, |r|_0 and |r|, flattened in variable order.
 
-    # x_{d,b,t,l} - final amount ordered at threshold level l
-    x = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                for l in range(1, L + 1):
-                    x[d, b, t, l] = m.continuous_var(lb=0, name=f"x_above_d{d}_b{b}_t{t}_l{l}")
+    Prices are broadcast over the axes they do not depend on and masked to the modelled orders.
+    """
+    D, B, T, L = inp.D, inp.B, inp.T, inp.L
+    mask = _order_mask(inp)
+    K = np.asarray(inp.K, dtype=np.float64)[mask]  # (D, B, T) -> per modelled order
+    return (
+        np.broadcast_to(np.asarray(inp.P_0, dtype=np.float64)[:, None, :], (D, B, T))[mask].tolist(),
+        np.broadcast_to(np.asarray(inp.P, dtype=np.float64)[:, None, :, :], (D, B, T, L))[mask].ravel().tolist(),
+        np.broadcast_to(np.asarray(inp.C_fix, dtype=np.float64)[:, :, None], (D, B, T))[mask].tolist(),
+        K.tolist(),
+        np.repeat(K, L).tolist(),
+    )
 
-    # r+_{d,b,t,0} - increase to order below threshold
-    r_plus_0 = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                r_plus_0[d, b, t] = m.continuous_var(lb=0, name=f"r_plus_0_d{d}_b{b}_t{t}")
 
-    # r-_{d,b,t,0} - decrease to order below threshold
-    r_minus_0 = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                r_minus_0[d, b, t] = m.continuous_var(lb=0, name=f"r_minus_0_d{d}_b{b}_t{t}")
+class _CachedModel:
+    """
+    Correction MIP for one structural shape, kept alive across solve() calls.
 
-    # r+_{d,b,t,l} - increase to order at threshold level l
-    r_plus = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                for l in range(1, L + 1):
-                    r_plus[d, b, t, l] = m.continuous_var(lb=0, name=f"r_plus_d{d}_b{b}_t{t}_l{l}")
+    The first solve builds the full model. Subsequent solves with the same
+    structural key only rewrite objective coefficients and right-hand sides
+    (re-registering the lazy limits, which CPLEX cannot modify).
+    Every solve is seeded with the planned orders, and with the previous
+    solution when there is one, as MIP starts.
+    """
 
-    # r-_{d,b,t,l} - decrease to order at threshold level l
-    r_minus = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                for l in range(1, L + 1):
-                    r_minus[d, b, t, l] = m.continuous_var(lb=0, name=f"r_minus_d{d}_b{b}_t{t}_l{l}")
-
-    # I_{b,t} - inventory at building b at end of day t
-    I = {}
-    for b in range(B):
-        for t in range(T):
-            I[b, t] = m.continuous_var(lb=0, name=f"inv_b{b}_t{t}")
-
-    # y^{order}_{d,b,t} - binary indicator if order placed
-    y_order = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                y_order[d, b, t] = m.binary_var(name=f"y_order_d{d}_b{b}_t{t}")
+    def __init__(self, inp: SolverInputV2Correction) -> None:
+        T, D, B, L = inp.T, inp.D, inp.B, inp.L
 
-    # y^{threshold}_{d,b,t,l} - binary indicator if threshold l reached
-    y_threshold = {}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                for l in range(1, L + 1):
-                    y_threshold[d, b, t, l] = m.binary_var(name=f"y_thresh_d{d}_b{b}_t{t}_l{l}")
+        m = Model(name="coffee_inventory_v2_correction")
+        self.model = m
+        self.last_solution: SolveSolution | None = None
 
-    # Objective function: minimize total cost including correction costs
-    # Cost = purchase cost + fixed delivery cost + correction costs
+        # Index sets
+        dbt = list(_order_keys(inp))
+        dbtl = [(d, b, t, l) for d, b, t in dbt for l in range(1, L + 1)]
+        bt = [(b, t) for b in range(B) for t in range(T)]
 
-    purchase_cost = m.sum(inp.P_0[d][t] * x_0[d, b, t] for d in range(D) for b in range(B) for t in range(T))
+        # Upper bound for the last threshold level and widths of the threshold bands
+        S_max = float(np.max(inp.S))
+        Q_diff = [inp.Q[l + 1] - inp.Q[l] for l in range(L)]
 
-    threshold_cost = m.sum(
-        inp.P[d][t][l - 1] * x[d, b, t, l]
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    )
+        # Decision variables
 
-    fixed_cost = m.sum(inp.C_fix[d][b] * y_order[d, b, t] for d in range(D) for b in range(B) for t in range(T))
+        # x_{d,b,t,0} - final amount ordered below first threshold
+        x_0 = m.continuous_var_dict(dbt, lb=0, name=lambda k: f"x_below_d{k[0]}_b{k[1]}_t{k[2]}")
 
-    # Correction cost for below-threshold orders
-    correction_cost_0 = m.sum(
-        inp.K[d][b][t] * (r_plus_0[d, b, t] + r_minus_0[d, b, t]) for d in range(D) for b in range(B) for t in range(T)
-    )
+        # x_{d,b,t,l} - final amount ordered at threshold level l
+        x = m.continuous_var_dict(dbtl, lb=0, name=lambda k: f"x_above_d{k[0]}_b{k[1]}_t{k[2]}_l{k[3]}")
 
-    # Correction cost for threshold-level orders
-    correction_cost_l = m.sum(
-        inp.K[d][b][t] * (r_plus[d, b, t, l] + r_minus[d, b, t, l])
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    )
+        # |r|_{d,b,t,0} - absolute correction of order below threshold, |x_0 - x^{kor}_0|
+        # (replaces r+ - r-; both are penalised, so only their sum is needed in the model)
+        abs_corr_0 = m.continuous_var_dict(dbt, lb=0, name=lambda k: f"abs_corr_0_d{k[0]}_b{k[1]}_t{k[2]}")
 
-    m.minimize(purchase_cost + threshold_cost + fixed_cost + correction_cost_0 + correction_cost_l)
+        # |r|_{d,b,t,l} - absolute correction of order at threshold level l
+        abs_corr = m.continuous_var_dict(dbtl, lb=0, name=lambda k: f"abs_corr_d{k[0]}_b{k[1]}_t{k[2]}_l{k[3]}")
 
-    # Constraints
+        # I_{b,t} - inventory at building b at end of day t
+        I = m.continuous_var_dict(bt, lb=0, name=lambda k: f"inv_b{k[0]}_t{k[1]}")
 
-    # NEW: Link x to x_kor via correction variables
-    # x_{d,b,t,0} = x^{kor}_{d,b,t,0} + r+_{d,b,t,0} - r-_{d,b,t,0}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                x_kor_0_val = inp.x_kor_0.get((d, b, t), 0.0)
-                m.add_constraint(x_0[d, b, t] == x_kor_0_val + r_plus_0[d, b, t] - r_minus_0[d, b, t])
+        # y^{order}_{d,b,t} - binary indicator if order placed
+        y_order = m.binary_var_dict(dbt, name=lambda k: f"y_order_d{k[0]}_b{k[1]}_t{k[2]}")
 
-    # x_{d,b,t,l} = x^{kor}_{d,b,t,l} + r+_{d,b,t,l} - r-_{d,b,t,l}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
+        # y^{threshold}_{d,b,t,l} - binary indicator if threshold l reached
+        y_threshold = m.binary_var_dict(dbtl, name=lambda k: f"y_thresh_d{k[0]}_b{k[1]}_t{k[2]}_l{k[3]}")
+
+        self.x_0, self.x, self.I = x_0, x, I
+        self.abs_corr_0, self.abs_corr = abs_corr_0, abs_corr
+        self.y_order, self.y_threshold = y_order, y_threshold
+
+        # Objective function: minimize total cost including correction costs
+        # Cost = purchase cost + fixed delivery cost + correction costs
+
+        # Each term is a single scal_prod over variables and coefficients flattened in index-set order
+        P_0_coefs, P_coefs, C_fix_coefs, K_0_coefs, K_coefs = _cost_coefficients(inp)
+
+        purchase_cost = m.scal_prod(list(x_0.values()), P_0_coefs)
+
+        threshold_cost = m.scal_prod(list(x.values()), P_coefs)
+
+        fixed_cost = m.scal_prod(list(y_order.values()), C_fix_coefs)
+
+        # Correction cost for below-threshold orders
+        correction_cost_0 = m.scal_prod(list(abs_corr_0.values()), K_0_coefs)
+
+        # Correction cost for threshold-level orders
+        correction_cost_l = m.scal_prod(list(abs_corr.values()), K_coefs)
+
+        m.minimize(purchase_cost + threshold_cost + fixed_cost + correction_cost_0 + correction_cost_l)
+
+        # Constraints
+        # Same conventions as solver_v2._CachedModel: data-dependent constants on the right-hand side,
+        # add_constraints_ for families that update() never touches
+
+        # NEW: Bound the absolute corrections by the deviation from x_kor
+        # |r|_{d,b,t,0} >= x_{d,b,t,0} - x^{kor}_{d,b,t,0} and |r|_{d,b,t,0} >= x^{kor}_{d,b,t,0} - x_{d,b,t,0}
+        corr_0_up_cts = m.add_constraints(
+            abs_corr_0[d, b, t] - x_0[d, b, t] >= -inp.x_kor_0.get((d, b, t), 0.0) for d, b, t in dbt
+        )
+        corr_0_down_cts = m.add_constraints(
+            abs_corr_0[d, b, t] + x_0[d, b, t] >= inp.x_kor_0.get((d, b, t), 0.0) for d, b, t in dbt
+        )
+        self.corr_0_cts = dict(zip(dbt, zip(corr_0_up_cts, corr_0_down_cts)))
+
+        # |r|_{d,b,t,l} >= x_{d,b,t,l} - x^{kor}_{d,b,t,l} and |r|_{d,b,t,l} >= x^{kor}_{d,b,t,l} - x_{d,b,t,l}
+        corr_up_cts = m.add_constraints(
+            abs_corr[d, b, t, l] - x[d, b, t, l] >= -inp.x_kor.get((d, b, t, l), 0.0) for d, b, t, l in dbtl
+        )
+        corr_down_cts = m.add_constraints(
+            abs_corr[d, b, t, l] + x[d, b, t, l] >= inp.x_kor.get((d, b, t, l), 0.0) for d, b, t, l in dbtl
+        )
+        self.corr_cts = dict(zip(dbtl, zip(corr_up_cts, corr_down_cts)))
+
+        # NEW: Maximum correction constraint
+        # sum_l |r|_{d,b,t,l} + |r|_{d,b,t,0} <= R^max_{d,b,t}
+        max_correction_cts = m.add_constraints(
+            abs_corr_0[d, b, t] + m.sum(abs_corr[d, b, t, l] for l in range(1, L + 1)) <= inp.R_max[d][b][t]
+            for d, b, t in dbt
+        )
+        self.max_correction_cts = dict(zip(dbt, max_correction_cts))
+
+        # Inventory balance with delivery times and historical orders
+        # Orders placed on day tau from distributor d arrive at building b on day tau + X[d][b];
+        # index them once by arrival (b, t) instead of scanning all (d, tau) for every (b, t)
+        arrivals: defaultdict[tuple[int, int], list[tuple[int, int]]] = defaultdict(list)
+        for d in range(D):
+            for b in range(B):
+                for tau in range(T):
+                    t = tau + inp.X[d][b]
+                    if 0 <= t < T:
+                        arrivals[b, t].append((d, tau))
+
+        hist_by_bt = _historical_arrivals(inp)
+
+        def build_balance(key: tuple[int, int]) -> Any:
+            b, t = key
+            # Deliveries arriving on day t (ordered at tau where tau + X[d][b] = t), accumulated in one expression
+            deliveries_today = m.linear_expr()
+            for d, tau in arrivals[b, t]:
+                deliveries_today.add_term(x_0[d, b, tau], 1)
                 for l in range(1, L + 1):
-                    x_kor_val = inp.x_kor.get((d, b, t, l), 0.0)
-                    m.add_constraint(x[d, b, t, l] == x_kor_val + r_plus[d, b, t, l] - r_minus[d, b, t, l])
+                    deliveries_today.add_term(x[d, b, tau, l], 1)
 
-    # NEW: Maximum correction constraint
-    # sum_l(r+_{d,b,t,l} + r-_{d,b,t,l}) + r+_{d,b,t,0} + r-_{d,b,t,0} <= R^max_{d,b,t}
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                total_correction = r_plus_0[d, b, t] + r_minus_0[d, b, t]
-                total_correction += m.sum(r_plus[d, b, t, l] + r_minus[d, b, t, l] for l in range(1, L + 1))
-                m.add_constraint(total_correction <= inp.R_max[d][b][t])
-
-    # Inventory balance with delivery times and historical orders
-    for b in range(B):
-        for t in range(T):
-            # Deliveries arriving on day t (ordered at tau where tau + X[d][b] = t)
-            deliveries_today = m.sum(x_0[d, b, tau] for d in range(D) for tau in range(T) if tau + inp.X[d][b] == t)
-
-            deliveries_today += m.sum(
-                x[d, b, tau, l] for d in range(D) for tau in range(T) for l in range(1, L + 1) if tau + inp.X[d][b] == t
-            )
-
-            # Historical orders arriving today
-            hist_deliveries_today = sum(
-                inp.x_hist.get((d, b, tau), 0.0) for d in range(D) for tau in range(-100, 0) if tau + inp.X[d][b] == t
-            )
-
-            if t == 0:
-                m.add_constraint(
-                    I[b, t]
-                    == (1 - inp.alpha) * inp.I_0[b] + deliveries_today + hist_deliveries_today - inp.Demand[b][t]
-                )
-            else:
-                m.add_constraint(
-                    I[b, t]
-                    == (1 - inp.alpha) * I[b, t - 1] + deliveries_today + hist_deliveries_today - inp.Demand[b][t]
-                )
-
-    # Warehouse capacity constraints
-    for b in range(B):
-        for t in range(T):
-            m.add_constraint(I[b, t] <= inp.V_max[b])
-
-    # Link order amount to binary order indicator
-    for d in range(D):
-        for b in range(B):
-            for t in range(T):
-                m.add_constraint(x_0[d, b, t] <= inp.S[d][t] * y_order[d, b, t])
-
-    # Distributor supply limit
-    for d in range(D):
-        for t in range(T):
-            total_ordered = m.sum(x_0[d, b, t] for b in range(B))
-            total_ordered += m.sum(x[d, b, t, l] for b in range(B) for l in range(1, L + 1))
-            m.add_constraint(total_ordered <= inp.S[d][t])
-
-    # Threshold constraints
-    for d in range(D):
-        for b in range(B):
+            # I[b,t] - (1-alpha)*I[b,t-1] - deliveries = historical deliveries - demand (+ (1-alpha)*I_0[b] on day 0)
+            carried_over = 0 if t == 0 else (1 - inp.alpha) * I[b, t - 1]
+            return I[b, t] - carried_over - deliveries_today == _balance_rhs(inp, hist_by_bt, b, t)
+
+        balance_cts = [build_balance(key) for key in bt]
+        self.balance_cts = dict(zip(bt, m.add_constraints(balance_cts)))
+
+        # Warehouse capacity constraints
+        # Registered together with the supply limit in set_lazy_limits()
+
+        # Link order amount to binary order indicator
+        # x_0 <= S * y_order and x_0 <= Q[1] are merged into a single row with the tighter bound
+        m.add_constraints_(x_0[d, b, t] <= min(inp.S[d][t], inp.Q[1]) * y_order[d, b, t] for d, b, t in dbt)
+
+        # Distributor supply limit, total ordered from d on day t (limit added in set_lazy_limits())
+        self.supply_lhs = {}
+        for d in range(D):
             for t in range(T):
-                # Link threshold variables to order variable
-                for l in range(1, L + 1):
-                    m.add_constraint(y_threshold[d, b, t, l] <= y_order[d, b, t])
+                ordered = m.linear_expr()
+                for b in range(B):
+                    if (d, b, t) in x_0:
+                        ordered.add_term(x_0[d, b, t], 1)
+                        for l in range(1, L + 1):
+                            ordered.add_term(x[d, b, t, l], 1)
+                self.supply_lhs[d, t] = ordered
+        self.set_lazy_limits(inp)
+
+        # Threshold constraints
+        # Link threshold variables to order variable
+        # Only the first level needs the row: the band bounds below give y_threshold[l+1] <= y_threshold[l]
+        # for every non-empty band, so the chain is only added explicitly for empty ones
+        m.add_constraints_(y_threshold[d, b, t, 1] <= y_order[d, b, t] for d, b, t in dbt)
+        m.add_constraints_(
+            y_threshold[d, b, t, l + 1] <= y_threshold[d, b, t, l] for d, b, t, l in dbtl if l < L and Q_diff[l] <= 0
+        )
+
+        # For intermediate thresholds l=1..L-1
+        m.add_constraints_(x[d, b, t, l] <= Q_diff[l] * y_threshold[d, b, t, l] for d, b, t, l in dbtl if l < L)
+
+        # For the last threshold L
+        m.add_constraints_(x[d, b, t, L] <= S_max * y_threshold[d, b, t, L] for d, b, t in dbt)
+
+        # Threshold activation constraints
+        m.add_constraints_(x_0[d, b, t] >= inp.Q[1] * y_threshold[d, b, t, 1] for d, b, t in dbt)
+
+        m.add_constraints_(x[d, b, t, l] >= Q_diff[l] * y_threshold[d, b, t, l + 1] for d, b, t, l in dbtl if l < L)
+
+        self.set_mip_starts(inp)
+
+    def set_lazy_limits(self, inp: SolverInputV2Correction) -> None:
+        """
+        Register warehouse capacity and distributor supply limits as lazy constraints.
+
+        They rarely bind, so CPLEX only adds them to the LP once violated. Lazy constraints
+        cannot be modified in place, so they are cleared and re-added on every update.
+        """
+        m = self.model
+        m.clear_lazy_constraints()
+        m.add_lazy_constraints([self.I[b, t] <= inp.V_max[b] for b, t in self.I])
+        m.add_lazy_constraints([lhs <= inp.S[d][t] for (d, t), lhs in self.supply_lhs.items()])
+
+    def set_mip_starts(self, inp: SolverInputV2Correction) -> None:
+        """Seed CPLEX with the planned orders and the previous solution; both are repaired if infeasible."""
+        m = self.model
+        m.clear_mip_starts()
+
+        # Keeping the plan unchanged: x = x_kor with no correction, order and threshold
+        # indicators set wherever the plan orders anything at that level
+        start = m.new_solution()
+        planned_total = dict.fromkeys(self.y_order, 0.0)
+        for key, var in self.x_0.items():
+            amount = inp.x_kor_0.get(key, 0.0)
+            start.add_var_value(var, amount)
+            planned_total[key] += amount
+        for key_l, var in self.x.items():
+            amount = inp.x_kor.get(key_l, 0.0)
+            start.add_var_value(var, amount)
+            start.add_var_value(self.y_threshold[key_l], 1 if amount > 0 else 0)
+            planned_total[key_l[:3]] += amount
+        for key, var in self.y_order.items():
+            start.add_var_value(var, 1 if planned_total[key] > 0 else 0)
+        for var in self.abs_corr_0.values():
+            start.add_var_value(var, 0.0)
+        for var in self.abs_corr.values():
+            start.add_var_value(var, 0.0)
+        m.add_mip_start(start, effort_level=EffortLevel.Repair)
+
+        if self.last_solution is not None:
+            m.add_mip_start(self.last_solution, effort_level=EffortLevel.Repair)
+
+    def update(self, inp: SolverInputV2Correction) -> None:
+        """Rewrite objective coefficients and right-hand sides for new non-structural data."""
+        hist_by_bt = _historical_arrivals(inp)
+        for (b, t), ct in self.balance_cts.items():
+            ct.rhs = _balance_rhs(inp, hist_by_bt, b, t)
+        for key, (up_ct, down_ct) in self.corr_0_cts.items():
+            up_ct.rhs = -inp.x_kor_0.get(key, 0.0)
+            down_ct.rhs = inp.x_kor_0.get(key, 0.0)
+        for key_l, (up_ct, down_ct) in self.corr_cts.items():
+            up_ct.rhs = -inp.x_kor.get(key_l, 0.0)
+            down_ct.rhs = inp.x_kor.get(key_l, 0.0)
+        for (d, b, t), ct in self.max_correction_cts.items():
+            ct.rhs = inp.R_max[d][b][t]
+        self.set_lazy_limits(inp)
+
+        objective = self.model.objective_expr
+        variables = (self.x_0, self.x, self.y_order, self.abs_corr_0, self.abs_corr)
+        for family, coefs in zip(variables, _cost_coefficients(inp)):
+            for var, coef in zip(family.values(), coefs):
+                objective.set_coefficient(var, coef)
+
+        self.set_mip_starts(inp)
+
+
+def _get_model(inp: SolverInputV2Correction) -> _CachedModel:
+    """Return a model for the input's structure, building it or updating a cached one."""
+    return _get_cached_model(_MODEL_CACHE, _structural_key(inp), inp, lambda: _CachedModel(inp))
+
+
+def solve(
+    inp: SolverInputV2Correction, mip_gap: float = 0.005, time_limit: float | None = 300
+) -> SolverOutputV2Correction:
+    """
+    Build and solve the advanced coffee ordering MIP model with correction capability.
 
-                # x_0 is limited by first threshold Q[1]
-                m.add_constraint(x_0[d, b, t] <= inp.Q[1])
+    The model allows modifying previously planned orders (x_kor) by:
+    - r_plus: increasing the order amount
+    - r_minus: decreasing the order amount
 
-                # For intermediate thresholds l=1..L-1
-                for l in range(1, L):
-                    m.add_constraint(x[d, b, t, l] <= (inp.Q[l + 1] - inp.Q[l]) * y_threshold[d, b, t, l])
+    Subject to correction costs (K per unit changed) and limits (R_max). The model
+    prices the absolute change |x - x_kor|; r_plus and r_minus are recovered from the
+    final amounts afterwards.
 
-                # For the last threshold L
-                S_max = max(inp.S[d][t] for d in range(D) for t in range(T))
-                m.add_constraint(x[d, b, t, L] <= S_max * y_threshold[d, b, t, L])
+    Models are cached by structural shape (see `_structural_key`), so repeated calls
+    with new demand, stock, prices or planned orders reuse the built model.
 
-                # Threshold activation constraints
-                m.add_constraint(x_0[d, b, t] >= inp.Q[1] * y_threshold[d, b, t, 1])
+    mip_gap is the relative MIP gap at which CPLEX stops, and time_limit caps solve time in
+    seconds (None for no limit); a feasible solution found within the limit is accepted.
 
-                for l in range(1, L):
-                    m.add_constraint(x[d, b, t, l] >= (inp.Q[l + 1] - inp.Q[l]) * y_threshold[d, b, t, l + 1])
+    Returns SolverOutputV2Correction with the optimal solution or raises SolverFail on error.
+    """
+    T, D, B, L = inp.T, inp.D, inp.B, inp.L
+
+    # Validation
+    assert len(inp.V_max) == B
+    assert len(inp.Q) == L + 1
+    assert len(inp.P_0) == D and all(len(inp.P_0[d]) == T for d in range(D))
+    assert len(inp.P) == D and all(len(inp.P[d]) == T for d in range(D))
+    assert all(len(inp.P[d][t]) == L for d in range(D) for t in range(T))
+    assert len(inp.C_fix) == D and all(len(inp.C_fix[d]) == B for d in range(D))
+    assert len(inp.Demand) == B and all(len(inp.Demand[b]) == T for b in range(B))
+    assert len(inp.I_0) == B
+    assert len(inp.S) == D and all(len(inp.S[d]) == T for d in range(D))
+    assert len(inp.X) == D and all(len(inp.X[d]) == B for d in range(D))
+    assert len(inp.K) == D and all(len(inp.K[d]) == B for d in range(D))
+    assert all(len(inp.K[d][b]) == T for d in range(D) for b in range(B))
+    assert len(inp.R_max) == D and all(len(inp.R_max[d]) == B for d in range(D))
+    assert all(len(inp.R_max[d][b]) == T for d in range(D) for b in range(B))
+
+    cached = _get_model(inp)
+    m = cached.model
+    x_0, x, I = cached.x_0, cached.x, cached.I
+    y_order, y_threshold = cached.y_order, cached.y_threshold
 
     # Solve
+    # Stop at a relative MIP gap of mip_gap instead of proving optimality, optionally within time_limit seconds
+    m.parameters.mip.tolerances.mipgap = mip_gap
+    if time_limit:
+        m.parameters.timelimit = time_limit
+    else:
+        m.parameters.timelimit.reset()
     sol = m.solve()
 
-    if sol is None:
-        status = m.get_solve_status()
+    status = m.get_solve_status()
+    if sol is None or status not in (JobSolveStatus.OPTIMAL_SOLUTION, JobSolveStatus.FEASIBLE_SOLUTION):
         raise SolverFail(f"Solver failed to return a solution. Status: {status}")
+    cached.last_solution = sol
 
-    # Extract solution
-    x_0_vals = {(d, b, t): float(x_0[d, b, t].solution_value) for d in range(D) for b in range(B) for t in range(T)}
-
-    x_vals = {
-        (d, b, t, l): float(x[d, b, t, l].solution_value)
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    }
-
-    r_plus_0_vals = {
-        (d, b, t): float(r_plus_0[d, b, t].solution_value) for d in range(D) for b in range(B) for t in range(T)
-    }
+    # Extract solution with one batched value lookup per variable family;
+    # orders left out of the model (see `_order_keys`) are reported as 0
+    dbt = [(d, b, t) for d in range(D) for b in range(B) for t in range(T)]
+    dbtl = [(d, b, t, l) for d, b, t in dbt for l in range(1, L + 1)]
 
-    r_minus_0_vals = {
-        (d, b, t): float(r_minus_0[d, b, t].solution_value) for d in range(D) for b in range(B) for t in range(T)
-    }
+    x_0_vals = dict.fromkeys(dbt, 0.0)
+    x_0_vals.update(zip(x_0, sol.get_value_list(list(x_0.values()))))
 
-    r_plus_vals = {
-        (d, b, t, l): float(r_plus[d, b, t, l].solution_value)
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    }
+    x_vals = dict.fromkeys(dbtl, 0.0)
+    x_vals.update(zip(x, sol.get_value_list(list(x.values()))))
 
-    r_minus_vals = {
-        (d, b, t, l): float(r_minus[d, b, t, l].solution_value)
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    }
+    I_vals = dict(zip(I, sol.get_value_list(list(I.values()))))
 
-    I_vals = {(b, t): float(I[b, t].solution_value) for b in range(B) for t in range(T)}
+    y_order_vals = dict.fromkeys(dbt, 0)
+    y_order_vals.update(zip(y_order, (int(round(v)) for v in sol.get_value_list(list(y_order.values())))))
 
-    y_order_vals = {
-        (d, b, t): int(round(y_order[d, b, t].solution_value)) for d in range(D) for b in range(B) for t in range(T)
-    }
-
-    y_threshold_vals = {
-        (d, b, t, l): int(round(y_threshold[d, b, t, l].solution_value))
-        for d in range(D)
-        for b in range(B)
-        for t in range(T)
-        for l in range(1, L + 1)
-    }
+    y_threshold_vals = dict.fromkeys(dbtl, 0)
+    y_threshold_vals.update(zip(y_threshold, (int(round(v)) for v in sol.get_value_list(list(y_threshold.values())))))
 
     obj = float(m.objective_value)
 
+    # Split each correction into its increase and decrease relative to the planned amount
+    r_plus_0_vals = {k: max(v - inp.x_kor_0.get(k, 0.0), 0.0) for k, v in x_0_vals.items()}
+    r_minus_0_vals = {k: max(inp.x_kor_0.get(k, 0.0) - v, 0.0) for k, v in x_0_vals.items()}
+    r_plus_vals = {k: max(v - inp.x_kor.get(k, 0.0), 0.0) for k, v in x_vals.items()}
+    r_minus_vals = {k: max(inp.x_kor.get(k, 0.0) - v, 0.0) for k, v in x_vals.items()}
+
     # Calculate total correction cost
     total_correction_cost = sum(
         inp.K[d][b][t] * (r_plus_0_vals[d, b, t] + r_minus_0_vals[d, b, t])
@@ -1,8 +1,5 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-sns.set(style="whitegrid")
 
 # =====================
 # DANE
@@ -13,73 +10,136 @@ T = list(range(1,8))
 Thist = [-3,-2,-1,0]
 L = [1,2,3]
 
-I0 = {"B1":25, "B2":15, "B3":10}
+I0 = np.array([25,15,10], dtype=np.int16)  # B1, B2, B3
+
+# zapotrzebowanie (B x T) jako ciągła tablica int16
+DEMAND = np.array([
+    [18,14,16,15,17,18,19],  # B1
+    [10,12,11,13,12,14,13],  # B2
+    [8,9,10,9,11,10,12],     # B3
+], dtype=np.int16)
+
+# dostępność stała w czasie - widok (D x T) na kolumnę [D1, D2], bez kopiowania
+SUPPLY = np.broadcast_to(np.array([[90],[70]], dtype=np.int16), (len(D), len(T)))
+
+B_CODE = {b:i for i, b in enumerate(B)}
+D_CODE = {d:i for i, d in enumerate(D)}
 
-Demand = {
-    "B1":[18,14,16,15,17,18,19],
-    "B2":[10,12,11,13,12,14,13],
-    "B3":[8,9,10,9,11,10,12]
-}
+def demand(b, t):
+    return int(DEMAND[B_CODE[b], t-1])
 
-S = {
-    "D1":[90]*7,
-    "D2":[70]*7
-}
+def supply(d, t):
+    return int(SUPPLY[D_CODE[d], t-1])
 
-x0_data = [
-    ("D1","B1",-3,1,10), ("D1","B1",-3,2,0), ("D1","B1",-3,3,0),
-    ("D1","B1",-2,1,15), ("D1","B1",-2,2,0), ("D1","B1",-2,3,0),
-    ("D1","B1",-1,1,0), ("D1","B1",-1,2,20), ("D1","B1",-1,3,0),
-    ("D1","B1",0,1,0), ("D1","B1",0,2,0), ("D1","B1",0,3,0),
+# zamówienia historyczne x0 jako równoległe tablice (D, B, t, l, qty)
+x0_pairs = [("D1","B1"), ("D1","B2"), ("D2","B3")]
+x0_n = len(Thist)*len(L)  # wierszy na parę (D, B)
+x0_D = pd.Categorical(np.repeat([d for d, _ in x0_pairs], x0_n), categories=D)
+x0_B = pd.Categorical(np.repeat([b for _, b in x0_pairs], x0_n), categories=B)
+x0_t = np.tile(np.repeat(np.array(Thist, dtype=np.int8), len(L)), len(x0_pairs))
+x0_l = np.tile(np.array(L, dtype=np.int8), len(x0_pairs)*len(Thist))
+x0_qty = np.array([
+    10,0,0, 15,0,0, 0,20,0, 0,0,0,  # D1 -> B1
+    0,0,0, 30,0,0, 0,0,0, 0,0,0,    # D1 -> B2
+    5,0,0, 25,0,0, 0,0,0, 0,0,0,    # D2 -> B3
+], dtype=np.int16)
 
-    ("D1","B2",-3,1,0), ("D1","B2",-3,2,0), ("D1","B2",-3,3,0),
-    ("D1","B2",-2,1,30), ("D1","B2",-2,2,0), ("D1","B2",-2,3,0),
-    ("D1","B2",-1,1,0), ("D1","B2",-1,2,0), ("D1","B2",-1,3,0),
-    ("D1","B2",0,1,0), ("D1","B2",0,2,0), ("D1","B2",0,3,0),
+x0_df = pd.DataFrame({"D":x0_D, "B":x0_B, "t":x0_t, "l":x0_l, "qty":x0_qty})
 
-    ("D2","B3",-3,1,5), ("D2","B3",-3,2,0), ("D2","B3",-3,3,0),
-    ("D2","B3",-2,1,25), ("D2","B3",-2,2,0), ("D2","B3",-2,3,0),
-    ("D2","B3",-1,1,0), ("D2","B3",-1,2,0), ("D2","B3",-1,3,0),
-    ("D2","B3",0,1,0), ("D2","B3",0,2,0), ("D2","B3",0,3,0)
-]
+# tabele 2D do heatmap
+demand_df = pd.DataFrame(DEMAND, index=B, columns=T)  # Biuro x Dni
+s_df = pd.DataFrame(SUPPLY, index=D, columns=T)
 
-x0_df = pd.DataFrame(x0_data, columns=["D","B","t","l","qty"])
+# historyczne zamówienia x0 (D x B x Thist x L) -> B x Thist
+# agregacja sumy po poziomie rabatu L, żeby 2D było czytelne; dystrybutora nie ma w kluczu,
+# bo w x0_pairs każdy biurowiec ma jednego dystrybutora (B1,B2 -> D1; B3 -> D2)
+# jedno np.add.at po kodach (B, t) zamiast groupby + pivot
+x0_sum = np.zeros((len(B), len(Thist)), dtype=np.int16)
+np.add.at(x0_sum, (x0_B.codes, x0_t - Thist[0]), x0_qty)
+x0_pivot = pd.DataFrame(x0_sum, index=pd.Index(B, name="B"), columns=pd.Index(Thist, name="t"))
 
 # =====================
 # HEATMAPY 2D
 # =====================
+def _mini_heatmap(ax, arr, row_labels, col_labels, cmap, title, cbar=False, annot=None):
+    # pcolormesh + ax.text zamiast sns.heatmap - dla kilkunastu komórek seaborn to sam narzut;
+    # siatka rastrowana, więc przy eksporcie wektorowym nie powstaje osobna ścieżka na komórkę
+    im = ax.pcolormesh(arr, cmap=cmap, shading="nearest", rasterized=True)
+    ax.invert_yaxis()  # pierwszy wiersz na górze, jak w heatmapie
+    # etykiety tylko dla małych siatek - przy pełnym horyzoncie tekst w komórkach dominuje czas rysowania
+    if annot is None:
+        annot = arr.size <= 200
+    if annot:
+        # kolor napisu dla całej siatki naraz: biały na ciemnej połowie skali, czarny na jasnej
+        norm = (arr - arr.min()) / max(np.ptp(arr), 1)
+        text_colors = np.where(norm > 0.5, "w", "k")
+        labels = np.char.mod("%d", arr)
+        for i, j in np.ndindex(arr.shape):
+            ax.text(j, i, labels[i, j], ha="center", va="center", color=text_colors[i, j])
+    ax.set_xticks(np.arange(arr.shape[1]))
+    ax.set_xticklabels(col_labels)
+    ax.set_yticks(np.arange(arr.shape[0]))
+    ax.set_yticklabels(row_labels)
+    ax.grid(False)
+    ax.set_title(title)
+    if cbar:
+        ax.figure.colorbar(im, ax=ax)
+    return im
+
+def plot_all(path="wizualizacje.png"):
+    # matplotlib/seaborn ładowane dopiero przy rysowaniu - same dane ich nie potrzebują
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(style="whitegrid")
+    # ustawienia rc raz na wywołanie (po sns.set, który nadpisuje rcParams)
+    mpl.rcParams.update({
+        "font.family":"DejaVu Sans",
+        "font.size":9,
+        "figure.autolayout":False,
+        "path.simplify":True,
+        "path.simplify_threshold":1.0,
+        "agg.path.chunksize":10000,
+    })
+
+    # mapy kolorów rozwiązane raz i przekazywane jako obiekty
+    cmaps = {name: mpl.colormaps[name] for name in ("YlGnBu", "BuPu", "Greens")}
+
+    # jedna figura 2x2 zamiast czterech osobnych okien
+    fig, axes = plt.subplots(2, 2, figsize=(16,8))
+
+    # 1. Demand (B x T)
+    ax = axes[0,0]
+    _mini_heatmap(ax, demand_df.to_numpy(), B, T, cmaps["YlGnBu"], "Zapotrzebowanie dzienne [kg]", cbar=True)
+    ax.set_xlabel("Dzień")
+    ax.set_ylabel("Biurowiec")
+
+    # 2. Initial inventories (B) - trzy liczby, więc słupki zamiast heatmapy
+    ax = axes[0,1]
+    bars = ax.barh(B, I0, color="tab:orange")
+    ax.bar_label(bars, padding=3)
+    ax.invert_yaxis()  # B1 na górze, jak w pozostałych wykresach
+    ax.set_title("Stan początkowy magazynu [kg]")
+
+    # 3. Supplier availability (D x T)
+    ax = axes[1,0]
+    _mini_heatmap(ax, s_df.to_numpy(), D, T, cmaps["BuPu"], "Dostępność u dystrybutorów [kg]")
+    ax.set_xlabel("Dzień")
+    ax.set_ylabel("Dystrybutor")
+
+    # 4. Historical orders x0 (B x Thist, suma po D i L)
+    ax = axes[1,1]
+    _mini_heatmap(ax, x0_pivot.to_numpy(), B, Thist, cmaps["Greens"], "Historyczne zamówienia x0 (sumowane po poziomie rabatu) [kg]")
+    ax.set_xlabel("Dzień historyczny")
+    ax.set_ylabel("Biurowiec")
+
+    # jeden zapis do PNG zamiast interaktywnego okna
+    fig.tight_layout()
+    fig.savefig(path, dpi=96, bbox_inches=None)
+    plt.close(fig)
+    return path
+
 
-# 1. Demand (B x T)
-demand_df = pd.DataFrame(Demand, index=T).T  # Biuro x Dni
-plt.figure(figsize=(10,4))
-sns.heatmap(demand_df, annot=True, fmt="d", cmap="YlGnBu")
-plt.title("Zapotrzebowanie dzienne [kg]")
-plt.xlabel("Dzień")
-plt.ylabel("Biurowiec")
-plt.show()
-
-# 2. Initial inventories (B)
-plt.figure(figsize=(6,2))
-sns.heatmap(pd.DataFrame(I0.values(), index=I0.keys(), columns=["I0"]), annot=True, fmt="d", cmap="YlOrRd")
-plt.title("Stan początkowy magazynu [kg]")
-plt.show()
-
-# 3. Supplier availability (D x T)
-s_df = pd.DataFrame(S, index=T).T
-plt.figure(figsize=(10,3))
-sns.heatmap(s_df, annot=True, fmt="d", cmap="BuPu")
-plt.title("Dostępność u dystrybutorów [kg]")
-plt.xlabel("Dzień")
-plt.ylabel("Dystrybutor")
-plt.show()
-
-# 4. Historical orders x0 (D x B x Thist x L)
-# agregacja sumy po poziomie rabatu L, żeby 2D było czytelne
-x0_sum = x0_df.groupby(["D","B","t"])["qty"].sum().reset_index()
-x0_pivot = x0_sum.pivot(index="B", columns="t", values="qty")
-plt.figure(figsize=(8,4))
-sns.heatmap(x0_pivot, annot=True, fmt="d", cmap="Greens")
-plt.title("Historyczne zamówienia x0 (sumowane po poziomie rabatu) [kg]")
-plt.xlabel("Dzień historyczny")
-plt.ylabel("Biurowiec")
-plt.show()
+if __name__ == "__main__":
+    print("Zapisano:", plot_all())